@@ -1,8 +1,47 @@
+import http.client
 import json
-import urllib.parse
-from typing import Dict, Any, List
+import math
+import socket
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Tuple, Union
+from urllib.parse import quote
 
-import requests
+try:
+    import orjson  # optional: C-accelerated JSON encode/decode
+except ImportError:
+    orjson = None
+
+
+# The encoder is picked once at import time. Both produce compact JSON; the
+# stdlib fallback reuses one pre-built encoder instead of json.dumps(...,
+# separators=...) constructing a new JSONEncoder per command.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers only
+# need to catch the stdlib exception either way.
+if orjson is not None:
+    def _dumps(payload: Dict[str, Any]) -> str:
+        return orjson.dumps(payload).decode("utf-8")
+
+    _loads = orjson.loads
+else:
+    _dumps = json.JSONEncoder(separators=(",", ":")).encode
+    _loads = json.loads
+
+# How close (radians) fed-back base/shoulder/elbow angles must be to a T=122
+# target for the arm to count as having reached it.
+_AT_TARGET_TOL = math.radians(2.0)
+# Same for fed-back x/y/z (mm) against a T=104 target.
+_AT_XYZ_TOL = 5.0
+# Joint angles (b, s, e, h in degrees) that CMD_MOVE_INIT (T=100) drives to.
+_INIT_JOINTS = (0.0, 0.0, 90.0, 180.0)
+
+
+@dataclass(frozen=True)
+class PreparedCommand:
+    """A command serialized once into its final request path; see RoArmClient.prepare()."""
+    payload: Dict[str, Any]
+    path: str
 
 
 class RoArmClient:
@@ -10,27 +49,223 @@ class RoArmClient:
     Thin HTTP JSON client for Waveshare RoArm-M2-S.
 
     Uses the /js?json=... HTTP interface described in the official docs.
+    A single http.client.HTTPConnection (Nagle disabled) is kept open so every
+    command reuses the same keep-alive TCP connection instead of paying a
+    fresh handshake per move; it reconnects if the arm drops it.
+
+    All requests run on one background worker thread, so they reach the arm
+    in submission order and callers can overlap a send with other waiting.
     """
 
     def __init__(self, ip: str):
         self.ip = ip.rstrip("/")
+        self._conn = http.client.HTTPConnection(self.ip, timeout=5)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="roarm-http")
 
-    def _send_json(self, payload: Dict[str, Any]) -> str:
-        raw = json.dumps(payload)
-        encoded = urllib.parse.quote(raw)
-        url = f"http://{self.ip}/js?json={encoded}"
+        # Commands that never change are serialized once up front.
+        self._move_init = self.prepare({"T": 100})
+        self._feedback = self.prepare({"T": 105})
+        self._grip_cmds: Dict[float, PreparedCommand] = {}
+
+        # Pose tracking so callers can skip a feedback round-trip when the
+        # cartesian pose is already known: either the last T=104 target, or
+        # the pose a previously seen T=122 joint target was measured at once
+        # the arm had actually reached it.
+        self._last_xyzt: Optional[Tuple[float, float, float, float]] = None
+        self._last_joints: Optional[Tuple[float, float, float, float]] = None
+        self._joint_xyzt: Dict[Tuple[float, float, float, float], Tuple[float, float, float, float]] = {}
+        # Clamp angle (radians) of a pending T=106, for wait_until_settled.
+        self._grip_target: Optional[float] = None
+        # Last fed-back (b, s, e, t) joint radians, and their value when the
+        # latest motion command was queued (what wait_until_settled measures
+        # "has moved" against).
+        self._fb_joints: Optional[Tuple[float, float, float, float]] = None
+        self._settle_start: Optional[Tuple[float, float, float, float]] = None
+
+    @property
+    def last_xyzt(self) -> Optional[Tuple[float, float, float, float]]:
+        """Last commanded (x, y, z, t) of the end effector, or None if unknown."""
+        return self._last_xyzt
+
+    def _note_command(self, payload: Dict[str, Any]):
+        cmd = payload.get("T")
+        if cmd in (100, 104, 106, 122):
+            self._settle_start = self._fb_joints
+        if cmd == 104:
+            self._last_xyzt = (payload["x"], payload["y"], payload["z"], payload["t"])
+            self._last_joints = None
+            self._grip_target = None
+        elif cmd == 122:
+            self._last_joints = (payload["b"], payload["s"], payload["e"], payload["h"])
+            self._last_xyzt = self._joint_xyzt.get(self._last_joints)
+            self._grip_target = None
+        elif cmd == 106:
+            self._grip_target = payload["cmd"]
+        elif cmd == 100:
+            self._last_joints = _INIT_JOINTS
+            self._last_xyzt = self._joint_xyzt.get(self._last_joints)
+            self._grip_target = None
+
+    def _at_joint_target(self, fb: Dict[str, Any]) -> bool:
+        """
+        True if feedback shows the base, shoulder and elbow at the last T=122
+        target. The hand is left out: a gripper closed on an object stops
+        short of its commanded angle without moving the end effector.
+        """
+        if self._last_joints is None:
+            return False
+        try:
+            measured = (fb["b"], fb["s"], fb["e"])
+        except KeyError:
+            return False
+        return all(
+            abs(rad - math.radians(deg)) < _AT_TARGET_TOL
+            for rad, deg in zip(measured, self._last_joints[:3])
+        )
+
+    def _at_xyz_target(self, fb: Dict[str, Any]) -> bool:
+        """True if feedback shows the end effector at the last T=104 target."""
+        if self._last_xyzt is None:
+            return False
+        try:
+            measured = (fb["x"], fb["y"], fb["z"])
+        except KeyError:
+            return False
+        return all(abs(a - b) < _AT_XYZ_TOL for a, b in zip(measured, self._last_xyzt))
+
+    def _note_feedback(self, fb: Dict[str, Any]):
+        try:
+            self._fb_joints = (fb["b"], fb["s"], fb["e"], fb["t"])
+        except KeyError:
+            pass
+        # Only a reading taken at the joint target says where that target
+        # ends up; mid-motion polls and timed-out settles are not recorded.
+        if not self._at_joint_target(fb):
+            return
         try:
-            resp = requests.get(url, timeout=5)
-            resp.raise_for_status()
-            return resp.text
-        except requests.RequestException as e:
-            raise RuntimeError(f"Network error during arm command: {payload} to {url}: {e}") from e
+            pose = (fb["x"], fb["y"], fb["z"], fb.get("t", 0.0))
+        except KeyError:
+            return
+        self._last_xyzt = pose
+        self._joint_xyzt[self._last_joints] = pose
+
+    def prepare(self, payload: Dict[str, Any]) -> PreparedCommand:
+        """
+        Serialize a fixed command once so it can be re-sent without JSON
+        encoding or URL quoting (see send_precomputed / send_batch).
+        """
+        return PreparedCommand(payload, self._path_for(payload))
+
+    @staticmethod
+    def _path_for(payload: Dict[str, Any]) -> str:
+        return "/js?json=" + quote(_dumps(payload))
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self._conn.sock is None:
+            self._conn.connect()
+            # Commands are tiny and latency-bound; don't let Nagle hold them back.
+            self._conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return self._conn
+
+    def _fetch(self, path: str, payload: Dict[str, Any]) -> str:
+        """Run one GET on the keep-alive connection (worker thread only)."""
+        for attempt in range(2):
+            try:
+                conn = self._connect()
+                conn.request("GET", path)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                # The arm closed an idle keep-alive connection; reconnect once.
+                self._conn.close()
+                if attempt == 0:
+                    continue
+                raise RuntimeError(f"Network error during arm command: {payload} to {self.ip}: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                self._conn.close()
+                raise RuntimeError(f"Network error during arm command: {payload} to {self.ip}: {e}") from e
+
+            if resp.will_close:
+                self._conn.close()
+            if resp.status >= 400:
+                raise RuntimeError(f"Arm returned HTTP {resp.status} {resp.reason} for command: {payload}")
+            return body.decode("utf-8", errors="replace")
+
+    def _submit(self, path: str, payload: Dict[str, Any]) -> "Future[str]":
+        self._note_command(payload)
+        return self._executor.submit(self._fetch, path, payload)
+
+    def submit_json(self, payload: Dict[str, Any]) -> "Future[str]":
+        """
+        Queue a command on the worker thread and return immediately.
+
+        The returned Future resolves to the response text, or raises the same
+        RuntimeError as the blocking methods on network failure.
+        """
+        return self._submit(self._path_for(payload), payload)
+
+    def _send_json(self, payload: Dict[str, Any]) -> str:
+        return self.submit_json(payload).result()
+
+    def submit_precomputed(self, cmd: PreparedCommand) -> "Future[str]":
+        """Queue a prepared command on the worker thread; see submit_json."""
+        return self._submit(cmd.path, cmd.payload)
+
+    def send_precomputed(self, cmd: PreparedCommand) -> str:
+        """Send a command built by prepare() and wait for the response."""
+        return self.submit_precomputed(cmd).result()
+
+    def send_batch(
+        self,
+        payloads: List[Union[Dict[str, Any], PreparedCommand]],
+        interval: float = 0.0,
+        settle: Optional[Callable[[], None]] = None,
+    ) -> List[str]:
+        """
+        Send several commands back-to-back over the keep-alive session.
+
+        The firmware executes one command per request, so payloads are not
+        merged; this just streams them without per-method overhead. If
+        interval > 0, each command is sent first and the settle delay runs
+        while its HTTP round-trip is in flight, so the RTT hides inside the
+        pause instead of adding to it. If settle is given, it is called after
+        each command's response arrives (e.g. wait_until_settled).
+
+        Entries may be plain payload dicts or commands from prepare().
+        """
+        responses = []
+        for payload in payloads:
+            if isinstance(payload, PreparedCommand):
+                future = self.submit_precomputed(payload)
+            else:
+                future = self.submit_json(payload)
+            if interval > 0:
+                time.sleep(interval)
+            responses.append(future.result())
+            if settle is not None:
+                settle()
+        return responses
+
+    # --- Payload builders ---
+
+    @staticmethod
+    def joints_payload(angles: List[float], spd: float = 10, acc: float = 10) -> Dict[str, Any]:
+        """Build a CMD_JOINTS_ANGLE_CTRL (T=122) payload from [b, s, e, h]."""
+        if len(angles) != 4:
+            raise ValueError("Expected 4 joint angles [base, shoulder, elbow, hand]")
+        b, s, e, h = angles
+        return {"T": 122, "b": b, "s": s, "e": e, "h": h, "spd": spd, "acc": acc}
+
+    @staticmethod
+    def grip_payload(rad: float, spd: float = 0, acc: float = 0) -> Dict[str, Any]:
+        """Build a CMD_EOAT_HAND_CTRL (T=106) payload."""
+        return {"T": 106, "cmd": rad, "spd": spd, "acc": acc}
 
     # --- Basic motion commands ---
 
     def move_init(self) -> str:
         """Move to the initial position. CMD_MOVE_INIT (T=100)."""
-        return self._send_json({"T": 100})
+        return self.send_precomputed(self._move_init)
 
     def move_joints_deg(self, b: float, s: float, e: float, h: float, spd: float = 10, acc: float = 10) -> str:
         """
@@ -50,12 +285,77 @@ class RoArmClient:
         """
         Get coordinates, joint angles, and torque using CMD_SERVO_RAD_FEEDBACK (T=105).
         """
-        text = self._send_json({"T": 105})
+        text = self.send_precomputed(self._feedback)
         # Typically returns a JSON string like {"T":1051,"x":...}
         try:
-            return json.loads(text)
+            fb = _loads(text)
         except json.JSONDecodeError:
             return {"raw": text}
+        if isinstance(fb, dict):
+            self._note_feedback(fb)
+        return fb
+
+    def _settle_reached(self, fb: Dict[str, Any], joints: Tuple[float, ...], start: Tuple[float, ...]) -> bool:
+        """Whether a still arm has finished the last command (see wait_until_settled)."""
+        if self._grip_target is not None:
+            # A clamp closing on an object stops short of its target, so
+            # having moved at all counts too.
+            return (
+                abs(joints[3] - self._grip_target) < _AT_TARGET_TOL
+                or abs(joints[3] - start[3]) >= _AT_TARGET_TOL
+            )
+        if self._last_joints is not None:
+            return self._at_joint_target(fb)
+        if self._last_xyzt is not None:
+            return self._at_xyz_target(fb)
+        # Nothing known to compare against: wait until motion has been seen.
+        return any(abs(a - b) >= _AT_TARGET_TOL for a, b in zip(joints, start))
+
+    def wait_until_settled(
+        self,
+        poll_interval: float = 0.05,
+        timeout: float = 10.0,
+        tolerance: float = 0.005,
+        stable_polls: int = 2,
+    ) -> bool:
+        """
+        Poll feedback until the arm has finished the last command and stopped.
+
+        Returns True once `stable_polls` consecutive readings all differ from
+        the previous one by less than `tolerance` (radians) on every joint
+        and the last command is done: the base/shoulder/elbow are at the T=122
+        (or T=100 init) target, the end effector is at the T=104 target, or
+        the clamp is at a T=106 target or has moved since the command was
+        queued. "Moved" is measured from the last feedback read before the
+        command, or from the first poll if there was none. Returns False if
+        `timeout` seconds pass first. Polls go through the same worker as
+        motion commands, so the first one is only sent after any queued move.
+        """
+        deadline = time.monotonic() + timeout
+        start = self._settle_start
+        previous = None
+        stable = 0
+        while True:
+            fb = self.get_feedback()
+            try:
+                joints = (fb["b"], fb["s"], fb["e"], fb["t"])
+            except (KeyError, TypeError):
+                joints = None
+
+            if joints is not None:
+                if start is None:
+                    start = joints
+                if previous is not None and all(abs(a - b) < tolerance for a, b in zip(joints, previous)):
+                    stable += 1
+                    if stable >= stable_polls and self._settle_reached(fb, joints, start):
+                        return True
+                else:
+                    stable = 0
+            previous = joints
+
+            if time.monotonic() + poll_interval > deadline:
+                return False
+            time.sleep(poll_interval)
 
     # --- Gripper control (EoAT) ---
 
@@ -64,14 +364,20 @@ class RoArmClient:
         Clamp/wrist control via CMD_EOAT_HAND_CTRL (T=106).
         Default clamp range is ~1.08 (open) to 3.14 (closed).
         """
-        cmd = {"T": 106, "cmd": rad, "spd": spd, "acc": acc}
-        return self._send_json(cmd)
+        return self._send_json(self.grip_payload(rad, spd=spd, acc=acc))
+
+    def _grip(self, rad: float) -> str:
+        # Open/close only ever use a couple of fixed angles, so cache their commands.
+        cmd = self._grip_cmds.get(rad)
+        if cmd is None:
+            cmd = self._grip_cmds[rad] = self.prepare(self.grip_payload(rad))
+        return self.send_precomputed(cmd)
 
     def open_grip(self, rad_open: float = 1.20) -> str:
-        return self.set_grip_angle_rad(rad_open)
+        return self._grip(rad_open)
 
     def close_grip(self, rad_closed: float = 3.14) -> str:
-        return self.set_grip_angle_rad(rad_closed)
+        return self._grip(rad_closed)
 
     # --- Helper for joint lists ---
 
@@ -79,6 +385,17 @@ class RoArmClient:
         """
         Convenience wrapper: angles as [b, s, e, h].
         """
-        if len(angles) != 4:
-            raise ValueError("Expected 4 joint angles [base, shoulder, elbow, hand]")
-        return self.move_joints_deg(angles[0], angles[1], angles[2], angles[3], spd=spd, acc=acc)
+        return self._send_json(self.joints_payload(angles, spd=spd, acc=acc))
+
+    # --- Lifecycle ---
+
+    def close(self):
+        """Finish queued commands, then close the keep-alive connection."""
+        self._executor.shutdown(wait=True)
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,8 +1,8 @@
-import time
 from dataclasses import dataclass
-from typing import List
+from itertools import combinations
+from typing import List, Optional
 
-from arm.roarm_client import RoArmClient
+from arm.roarm_client import PreparedCommand, RoArmClient
 
 
 @dataclass
@@ -18,6 +18,8 @@ class PickPlaceConfig:
     grip_open_rad: float
     z_lift: float = 0.0
     pause_between_moves: float = 0.5
+    settle_on_feedback: bool = False  # poll joint feedback instead of a fixed pause
+    settle_timeout: Optional[float] = None  # None: derive from the poses, spd and acc
 
 
 class PickPlaceController:
@@ -25,45 +27,85 @@ class PickPlaceController:
         self.arm = arm
         self.cfg = config
 
+        # Poses, speeds and grip angles are fixed by the config, so every
+        # command in the routine is serialized once here.
+        self._cmd_home = self._prepare_joints(config.pose_home)
+        self._cmd_above_origin = self._prepare_joints(config.pose_above_origin)
+        self._cmd_pick_origin = self._prepare_joints(config.pose_pick_origin)
+        self._cmd_above_target = self._prepare_joints(config.pose_above_target)
+        self._cmd_place_target = self._prepare_joints(config.pose_place_target)
+        self._cmd_grip_closed = arm.prepare(arm.grip_payload(config.grip_closed_rad))
+        self._cmd_grip_open = arm.prepare(arm.grip_payload(config.grip_open_rad))
+
+        self._settle_timeout = config.settle_timeout
+        if self._settle_timeout is None:
+            self._settle_timeout = self._longest_move_time() * 1.5 + 1.0
+
+    def _longest_move_time(self) -> float:
+        """
+        Rough duration (s) of the longest joint move between any two configured
+        poses: cruise at spd plus ramping up to it and back down at acc.
+        """
+        cfg = self.cfg
+        poses = [cfg.pose_home, cfg.pose_above_origin, cfg.pose_pick_origin,
+                 cfg.pose_above_target, cfg.pose_place_target]
+        travel = max(
+            abs(a - b)
+            for p, q in combinations(poses, 2)
+            for a, b in zip(p[:3], q[:3])
+        )
+        # spd/acc of 0 mean the firmware's maximum; fall back to its default 10.
+        spd = cfg.spd or 10.0
+        acc = cfg.acc or 10.0
+        return travel / spd + spd / acc
+
+    def _prepare_joints(self, pose: List[float]) -> PreparedCommand:
+        return self.arm.prepare(self.arm.joints_payload(pose, spd=self.cfg.spd, acc=self.cfg.acc))
+
     def go_home(self):
         """Move the arm to the configured home pose."""
-        self.arm.move_joints_deg_list(
-            self.cfg.pose_home,
-            spd=self.cfg.spd,
-            acc=self.cfg.acc,
-        )
+        self.arm.send_precomputed(self._cmd_home)
 
     def _lift_z(self, delta_z: float):
         """
         Lift the current end-effector position along Z by delta_z (same units as feedback).
 
+        Uses the arm client's tracked pose when it already knows where the last
+        commanded move ends up, and only queries feedback otherwise.
+
         If something goes wrong (e.g., feedback is unavailable or malformed), returns without lifting.
         The arm will continue from its current position. This is to fail silently so we don't crash the POC.
         """
         if delta_z == 0:
             return
 
-        fb = self.arm.get_feedback()
-        if not isinstance(fb, dict):
-            print("Warning: Failed to get valid arm feedback for z-lift. Skipping lift operation.")
-            return
-
-        try:
-            x = fb["x"]
-            y = fb["y"]
-            z = fb["z"]
-            t = fb.get("t", 0.0)
-        except KeyError as e:
-            key_name = e.args[0] if e.args else 'unknown'
-            print(f"Warning: Arm feedback missing expected key '{key_name}'. Skipping lift operation.")
-            return
-
+        pose = self.arm.last_xyzt
+        if pose is None:
+            fb = self.arm.get_feedback()
+            if not isinstance(fb, dict):
+                print("Warning: Failed to get valid arm feedback for z-lift. Skipping lift operation.")
+                return
+
+            try:
+                pose = (fb["x"], fb["y"], fb["z"], fb.get("t", 0.0))
+            except KeyError as e:
+                key_name = e.args[0] if e.args else 'unknown'
+                print(f"Warning: Arm feedback missing expected key '{key_name}'. Skipping lift operation.")
+                return
+
+        x, y, z, t = pose
         # Move slightly up (or down) from current pose
         self.arm.move_cartesian(x, y, z + delta_z, t)
 
-    def _pause(self):
-        """Small delay to let a motion segment settle before the next one."""
-        time.sleep(self.cfg.pause_between_moves)
+    def _settle(self):
+        self.arm.wait_until_settled(timeout=self._settle_timeout)
+
+    def _run_segment(self, *payloads: PreparedCommand):
+        """Send a run of commands back-to-back, letting each one settle before the next."""
+        if self.cfg.settle_on_feedback:
+            self.arm.send_batch(list(payloads), settle=self._settle)
+        else:
+            self.arm.send_batch(list(payloads), interval=self.cfg.pause_between_moves)
 
     def execute_pick_place(self):
         """
@@ -76,45 +118,27 @@ class PickPlaceController:
         - Return home
         
         Raises:
-            RuntimeError: If network communication with the arm fails
-            requests.RequestException: If HTTP request to arm controller fails
+            RuntimeError: If network communication with the arm fails or it returns an HTTP error
             ValueError: If joint angles are invalid or out of range
         """
-        spd = self.cfg.spd
-        acc = self.cfg.acc
+        # Each segment runs until the next feedback-dependent z-lift and is
+        # streamed as one batch over the arm's keep-alive connection.
 
-        # Move to safe home first
-        self.go_home()
-        self._pause()
-
-        # Go to origin
-        self.arm.move_joints_deg_list(self.cfg.pose_above_origin, spd=spd, acc=acc)
-        self._pause()
+        # Move to safe home first, then go to origin
+        self._run_segment(self._cmd_home, self._cmd_above_origin)
         self._lift_z(self.cfg.z_lift)
 
-        self.arm.move_joints_deg_list(self.cfg.pose_pick_origin, spd=spd, acc=acc)
-        self._pause()
-        self.arm.close_grip(self.cfg.grip_closed_rad)
-        self._pause()
-
-        self.arm.move_joints_deg_list(self.cfg.pose_above_origin, spd=spd, acc=acc)
-        self._pause()
+        # Pick object
+        self._run_segment(self._cmd_pick_origin, self._cmd_grip_closed, self._cmd_above_origin)
         self._lift_z(self.cfg.z_lift)
 
         # Go to target
-        self.arm.move_joints_deg_list(self.cfg.pose_above_target, spd=spd, acc=acc)
-        self._pause()
+        self._run_segment(self._cmd_above_target)
         self._lift_z(self.cfg.z_lift)
 
-        self.arm.move_joints_deg_list(self.cfg.pose_place_target, spd=spd, acc=acc)
-        self._pause()
-        self.arm.open_grip(self.cfg.grip_open_rad)
-        self._pause()
-
-        self.arm.move_joints_deg_list(self.cfg.pose_above_target, spd=spd, acc=acc)
-        self._pause()
+        # Place object
+        self._run_segment(self._cmd_place_target, self._cmd_grip_open, self._cmd_above_target)
         self._lift_z(self.cfg.z_lift)
 
         # Return home
-        self.go_home()
-        self._pause()
+        self._run_segment(self._cmd_home)
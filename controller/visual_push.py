@@ -1,4 +1,5 @@
 # controller/visual_push.py
+import math
 from dataclasses import dataclass
 from typing import Tuple
 
@@ -54,7 +55,7 @@ class VisualPushController:
         dy_mm = dy_px * self.cfg.gain_xy
 
         # Clamp step magnitude
-        mag = (dx_mm ** 2 + dy_mm ** 2) ** 0.5
+        mag = math.hypot(dx_mm, dy_mm)
         if mag > self.cfg.max_step_mm and mag > 0:
             scale = self.cfg.max_step_mm / mag
             dx_mm *= scale
@@ -113,13 +114,14 @@ class VisualPushController:
 
         dir_u = tu - fu
         dir_v = tv - fv
-        norm = (dir_u ** 2 + dir_v ** 2) ** 0.5
+        norm = math.hypot(dir_u, dir_v)
         if norm == 0:
             return
 
         # Unit direction vector scaled by step size
-        step_u = (dir_u / norm) * self.cfg.push_step_px
-        step_v = (dir_v / norm) * self.cfg.push_step_px
+        scale = self.cfg.push_step_px / norm
+        step_u = dir_u * scale
+        step_v = dir_v * scale
 
         for _ in range(self.cfg.push_steps):
             self._nudge_xy(step_u, step_v)
@@ -1,22 +1,71 @@
+import argparse
+import os
+import pickle
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import cv2
 import numpy as np
 import yaml
 
-from vision.camera import VisionSensor
+try:
+    from yaml import CSafeLoader as YamlLoader  # libyaml bindings, much faster
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+from vision.camera import ThreadedVisionSensor, VisionSensor
+from vision.display import DisplayThread, HeadlessDisplay
 from vision.grid_detector import detect_zones, draw_box
-from vision.object_detector import detect_object_in_origin, draw_object_center
+from vision.object_detector import detect_object_in_origin, draw_object_center, object_color_range
 from vision.arm_detector import detect_tip
+from vision.scratch import VisionScratch
+from vision.specialize import make_range_detector
+from vision._numba import NUMBA_AVAILABLE
 from arm.roarm_client import RoArmClient
 from controller.pick_place import PickPlaceController, PickPlaceConfig
 from controller.visual_push import VisualPushController, VisualPushConfig
 from telemetry.logger import TelemetryLogger
+from telemetry.profiler import Profiler
+
+
+def _read_settings_cache(cache_path: str, stamp: tuple):
+    """Return the cached settings if the cache matches the YAML file's stamp, else None."""
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(cached, dict) or cached.get("stamp") != stamp:
+        return None
+    return cached.get("settings")
+
+
+def _write_settings_cache(cache_path: str, stamp: tuple, settings: dict):
+    # Best effort: a read-only checkout just means we parse YAML every start.
+    try:
+        with open(cache_path, "wb") as f:
+            pickle.dump({"stamp": stamp, "settings": settings}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
 
 
 def load_settings(path: str = "config/settings.yaml") -> dict:
+    """
+    Load settings.yaml, reusing a pickled snapshot next to it when the YAML
+    file hasn't changed (keyed on mtime + size).
+    """
+    cache_path = path + ".pkl"
     try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        settings = _read_settings_cache(cache_path, stamp)
+        if settings is not None:
+            return settings
         with open(path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+            settings = yaml.load(f, Loader=YamlLoader)
+        _write_settings_cache(cache_path, stamp, settings)
+        return settings
     except FileNotFoundError as e:
         raise FileNotFoundError(f"Failed to load configuration file '{path}': {e}") from e
     except yaml.YAMLError as e:
@@ -25,7 +74,23 @@ def load_settings(path: str = "config/settings.yaml") -> dict:
         raise RuntimeError(f"Unexpected error loading configuration file '{path}': {e}") from e
 
 
+def _scale_point(point, factor: float):
+    """Map an (x, y) detection from the downscaled frame back to full resolution."""
+    if point is None:
+        return None
+    return (round(point[0] * factor), round(point[1] * factor))
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Overhead-camera pick & place for the RoArm-M2-S.")
+    parser.add_argument(
+        "--no-display",
+        action="store_true",
+        help="Run headless: no preview window or overlays; type keys (h, v, r, q) + Enter on stdin instead",
+    )
+    args = parser.parse_args()
+    show_overlays = not args.no_display
+
     settings = load_settings()
 
     # Validate required configuration sections
@@ -40,21 +105,57 @@ def main():
     ctrl_cfg = settings["controller"]
 
     # --- Vision setup ---
-    vision = VisionSensor(
-        camera_index=cam_cfg.get("index", 0),
-        width=cam_cfg.get("width"),
-        height=cam_cfg.get("height"),
+    # Detection already splits work across our own threads (zones pool, capture,
+    # display); cap OpenCV's internal pool so the two don't oversubscribe cores.
+    cv2.setNumThreads(max(1, (os.cpu_count() or 2) // 2))
+
+    # Capture runs on its own thread; the loop below always sees the newest frame.
+    vision = ThreadedVisionSensor(
+        VisionSensor(
+            camera_index=cam_cfg.get("index", 0),
+            width=cam_cfg.get("width"),
+            height=cam_cfg.get("height"),
+            max_drain=cam_cfg.get("max_drain", 4),
+        )
+    )
+
+    # Colour thresholds are fixed for the run; bake each into its detector once
+    blue_range = make_range_detector(vision_cfg["blue_lower"], vision_cfg["blue_upper"])
+    red_range = make_range_detector(vision_cfg["red_lower"], vision_cfg["red_upper"])
+    tip_range = make_range_detector(vision_cfg["tip_pink_lower"], vision_cfg["tip_pink_upper"])
+    # Detection runs at detect_scale x the camera resolution; areas are
+    # configured in full-res pixels, so they shrink by detect_scale^2.
+    detect_scale = float(vision_cfg.get("detect_scale", 0.5))
+    inv_scale = 1.0 / detect_scale
+    area_scale = detect_scale * detect_scale
+    tip_min_area = int(vision_cfg.get("tip_min_area", 50) * area_scale)
+    min_zone_area = int(vision_cfg.get("min_zone_area", 2000) * area_scale)
+    min_object_area = int(vision_cfg.get("min_object_area", 800) * area_scale)
+    # Search windows around the last detections, also given in full-res pixels
+    tip_window = max(1, int(vision_cfg.get("tip_search_window", 128) * detect_scale))
+    zone_margin = max(1, int(vision_cfg.get("zone_search_margin", 32) * detect_scale))
+    zone_refresh_every = max(1, int(vision_cfg.get("zone_refresh_every", 30)))
+    object_range = object_color_range(
+        object_min_saturation=int(vision_cfg.get("object_min_saturation", 60)),
+        object_min_value=int(vision_cfg.get("object_min_value", 60)),
+        object_max_value=int(vision_cfg.get("object_max_value", 220)),
     )
+    # Fused Numba detection kernels (opt-in; plain OpenCV is faster on few cores)
+    use_numba = bool(vision_cfg.get("use_numba", False))
+    if use_numba and not NUMBA_AVAILABLE:
+        print("vision.use_numba is set but numba is not installed; using OpenCV.")
+        use_numba = False
+    if use_numba:
+        # Only now pay for importing numba (startup stays lean with it off).
+        from vision import _hsv_kernels
 
-    blue_lower = np.array(vision_cfg["blue_lower"], dtype=np.uint8)
-    blue_upper = np.array(vision_cfg["blue_upper"], dtype=np.uint8)
-    red_lower = np.array(vision_cfg["red_lower"], dtype=np.uint8)
-    red_upper = np.array(vision_cfg["red_upper"], dtype=np.uint8)
-    tip_pink_lower = np.array(vision_cfg["tip_pink_lower"], dtype=np.uint8)
-    tip_pink_upper = np.array(vision_cfg["tip_pink_upper"], dtype=np.uint8)
-    tip_min_area = int(vision_cfg.get("tip_min_area", 50))
-    min_zone_area = int(vision_cfg.get("min_zone_area", 2000))
-    min_object_area = int(vision_cfg.get("min_object_area", 800))
+        if _hsv_kernels.NUMBA_AVAILABLE:
+            _hsv_kernels.warmup()  # JIT/cache-load now rather than on the first frame
+        else:
+            print("vision.use_numba is set but numba failed to import; using OpenCV.")
+            use_numba = False
+    scratch = None  # VisionScratch buffers, (re)allocated when the frame size changes
+    small = None    # downscaled detection frame buffer
 
     # --- Arm + controller setup ---
     arm = RoArmClient(ip=arm_cfg["ip"])
@@ -71,6 +172,8 @@ def main():
         grip_open_rad=ctrl_cfg["grip_open_rad"],
         z_lift=ctrl_cfg.get("z_lift_mm", 0.0),
         pause_between_moves=ctrl_cfg.get("pause_between_moves", 0.5),
+        settle_on_feedback=ctrl_cfg.get("settle_on_feedback", False),
+        settle_timeout=ctrl_cfg.get("settle_timeout"),
     )
 
     controller = PickPlaceController(arm, pick_place_config)
@@ -87,6 +190,13 @@ def main():
     push_controller = VisualPushController(arm, push_config)
     
     logger = TelemetryLogger("telemetry.log")
+    # Per-stage timings, enabled with PROFILE=1; logged as "profile" events
+    profiler = Profiler(logger)
+    profile = profiler.stage
+    if args.no_display:
+        display = HeadlessDisplay()
+    else:
+        display = DisplayThread("Overhead View", max_width=cam_cfg.get("display_width", 640))
 
     # Move to home pose once at startup, then wait a bit before arming automation
     system_ready = False
@@ -102,61 +212,168 @@ def main():
     except Exception as e:
         print("Warning: failed to move to home pose at startup. Automation will remain disabled:", e)
 
+    # Pick & place runs on a worker thread so the vision loop keeps consuming
+    # frames while the arm moves; `busy` is shared with its done-callback.
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pick-place")
+    busy_lock = threading.Lock()
     busy = False
     use_visual_push = False  # Toggle with 'V' key
 
+    def try_claim_arm() -> bool:
+        nonlocal busy
+        with busy_lock:
+            if busy:
+                return False
+            busy = True
+            return True
+
+    def release_arm():
+        nonlocal busy
+        with busy_lock:
+            busy = False
+
+    def is_busy() -> bool:
+        with busy_lock:
+            return busy
+
+    def on_pick_place_done(future: Future):
+        # Done-callback exceptions are swallowed by concurrent.futures, so the
+        # arm must be released even if logging the outcome fails.
+        try:
+            error = future.exception()
+            if error is None:
+                logger.log("pick_place_success", {})
+            else:
+                logger.log("pick_place_error", {"error": str(error)})
+                print("Error during pick & place:", error)
+        finally:
+            release_arm()
+
+    last_frame_id = 0
+    # Previous detections in detect_frame coordinates, to narrow the next search
+    last_zones = (None, None)
+    last_tip = None
+    zone_tick = 0
+    refresh_zones = False
+    origin_box = target_box = None
+    tip_center = object_center = None
+
     try:
         while True:
-            frame = vision.get_frame()
+            with profile("get_frame"):
+                frame_id, frame = vision.get_frame_with_id()
             if frame is None:
                 print("No frame from camera, exiting.")
                 break
 
-            origin_box, target_box = detect_zones(
-                frame,
-                blue_lower,
-                blue_upper,
-                red_lower,
-                red_upper,
-                min_zone_area,
-            )
-
-            # Detect pink tip marker
-            tip_center = detect_tip(frame, tip_pink_lower, tip_pink_upper, tip_min_area)
-            if tip_center:
-                cv2.circle(frame, tip_center, 5, (255, 0, 255), -1)  # Magenta dot
-                cv2.putText(frame, "TIP", (tip_center[0] + 8, tip_center[1] - 8),
-                           cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 1, cv2.LINE_AA)
-
-            if origin_box:
-                draw_box(frame, origin_box, (255, 0, 0), "ORIGIN")
-            if target_box:
-                draw_box(frame, target_box, (0, 0, 255), "TARGET")
-
-            object_center = None
-            if origin_box:
-                object_center = detect_object_in_origin(
-                    frame,
-                    origin_box,
-                    min_object_area=min_object_area,
-                    object_min_saturation=int(vision_cfg.get("object_min_saturation", 60)),
-                    object_min_value=int(vision_cfg.get("object_min_value", 60)),
-                    object_max_value=int(vision_cfg.get("object_max_value", 220)),
-                )
-                if object_center:
-                    draw_object_center(frame, object_center)
-
-            # Display mode indicator
-            mode_text = "Mode: VISUAL PUSH" if use_visual_push else "Mode: SCRIPTED PICK/PLACE"
-            cv2.putText(frame, mode_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
-                       0.7, (0, 255, 0) if use_visual_push else (255, 255, 255), 2, cv2.LINE_AA)
-
-            # Display
-            cv2.imshow("Overhead View", frame)
-            key = cv2.waitKey(1) & 0xFF
+            # Only run detection on frames we haven't processed yet; a repeat
+            # (camera stalled) keeps the previous detections and overlays.
+            fresh = frame_id != last_frame_id
+            last_frame_id = frame_id
+            if fresh:
+                with profile("preprocess"):
+                    # Detect on a downscaled copy; boxes/centers are mapped back to full-res
+                    if detect_scale != 1.0:
+                        small_size = (round(frame.shape[1] * detect_scale), round(frame.shape[0] * detect_scale))
+                        if small is None or small.shape[1::-1] != small_size:
+                            small = np.empty((small_size[1], small_size[0], 3), np.uint8)
+                        cv2.resize(frame, small_size, dst=small, interpolation=cv2.INTER_AREA)
+                        detect_frame = small
+                    else:
+                        detect_frame = frame
+
+                    if scratch is None or not scratch.fits(detect_frame):
+                        scratch = VisionScratch.for_frame(detect_frame)
+
+                    # Convert once and share the HSV image across all detectors
+                    # (the Numba kernels work on BGR directly)
+                    hsv = None if use_numba else cv2.cvtColor(detect_frame, cv2.COLOR_BGR2HSV, dst=scratch.hsv)
+
+                # The tape squares don't move: re-detect zones only every
+                # zone_refresh_every frames, when one is missing, or on 'R'.
+                if refresh_zones or zone_tick == 0 or None in last_zones:
+                    with profile("detect_zones"):
+                        origin_box, target_box = detect_zones(
+                            detect_frame,
+                            blue_range,
+                            red_range,
+                            min_zone_area,
+                            hsv=hsv,
+                            use_numba=use_numba,
+                            scratch=scratch,
+                            # a manual refresh searches the whole frame again
+                            last_zones=(None, None) if refresh_zones else last_zones,
+                            zone_margin=zone_margin,
+                        )
+                    last_zones = (origin_box, target_box)
+                    refresh_zones = False
+                else:
+                    origin_box, target_box = last_zones
+                zone_tick = (zone_tick + 1) % zone_refresh_every
+
+                # Detect pink tip marker
+                with profile("detect_tip"):
+                    tip_center = detect_tip(
+                        detect_frame,
+                        tip_range,
+                        tip_min_area,
+                        hsv=hsv,
+                        scratch=scratch,
+                        last_center=last_tip,
+                        window=tip_window,
+                        use_numba=use_numba,
+                    )
+                last_tip = tip_center
+
+                object_center = None
+                if origin_box:
+                    with profile("detect_object"):
+                        object_center = detect_object_in_origin(
+                            detect_frame,
+                            origin_box,
+                            min_object_area=min_object_area,
+                            object_range=object_range,
+                            hsv=hsv,
+                            scratch=scratch,
+                            use_numba=use_numba,
+                        )
+
+                if detect_frame is not frame:
+                    origin_box = origin_box.scaled(inv_scale) if origin_box else None
+                    target_box = target_box.scaled(inv_scale) if target_box else None
+                    tip_center = _scale_point(tip_center, inv_scale)
+                    object_center = _scale_point(object_center, inv_scale)
+
+                # Overlays are drawn on the full-resolution frame (skipped when headless)
+                with profile("overlay"):
+                    if show_overlays:
+                        if tip_center:
+                            cv2.circle(frame, tip_center, 5, (255, 0, 255), -1)  # Magenta dot
+                            cv2.putText(frame, "TIP", (tip_center[0] + 8, tip_center[1] - 8),
+                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 1, cv2.LINE_AA)
+
+                        if origin_box:
+                            draw_box(frame, origin_box, (255, 0, 0), "ORIGIN")
+                        if target_box:
+                            draw_box(frame, target_box, (0, 0, 255), "TARGET")
+                        if object_center:
+                            draw_object_center(frame, object_center)
+
+                        # Display mode indicator
+                        mode_text = "Mode: VISUAL PUSH" if use_visual_push else "Mode: SCRIPTED PICK/PLACE"
+                        cv2.putText(frame, mode_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 
+                                   0.7, (0, 255, 0) if use_visual_push else (255, 255, 255), 2, cv2.LINE_AA)
+
+                        # Display (imshow/waitKey run on the display thread)
+                        display.show(frame)
+
+            key = display.poll_key()
             if key == 27:  # ESC
                 break
             elif key == ord('h') or key == ord('H'):  # H key to go home
+                if is_busy():
+                    print("Arm busy, ignoring home request.")
+                    continue
                 print("Returning to home position...")
                 try:
                     controller.go_home()
@@ -167,69 +384,73 @@ def main():
                 use_visual_push = not use_visual_push
                 mode_name = "VISUAL PUSH" if use_visual_push else "SCRIPTED PICK/PLACE"
                 print(f"Switched to {mode_name} mode")
+            elif key == ord('r') or key == ord('R'):  # R key to re-detect zones on the next frame
+                refresh_zones = True
+                print("Refreshing zone detection")
 
             # Trigger pick & place only after homing, if object detected in origin and not currently busy
-            if system_ready and not busy and origin_box and target_box and object_center:
-                busy = True
-                
-                if use_visual_push:
-                    # Visual push mode: requires tip marker to be visible
-                    if tip_center:
+            with profile("dispatch"):
+                if fresh and system_ready and origin_box and target_box and object_center and try_claim_arm():
+                    if use_visual_push:
+                        # Visual push mode: requires tip marker to be visible
+                        if tip_center:
+                            logger.log(
+                                "visual_push_start",
+                                {
+                                    "origin_box": origin_box._asdict(),
+                                    "target_box": target_box._asdict(),
+                                    "object_center": object_center,
+                                    "tip_center": tip_center,
+                                },
+                            )
+                            try:
+                                print("Visual push: Aligning tip to object...")
+                                # Align tip to object (simplified - in production, re-read vision each iteration)
+                                for i in range(10):
+                                    aligned = push_controller.align_tip_to_object(tip_center, object_center)
+                                    if aligned:
+                                        print(f"Aligned after {i+1} iterations")
+                                        break
+                                    # In a real implementation, re-read tip_center and object_center here
+                            
+                                print("Visual push: Pushing towards target...")
+                                # Push from origin center towards target center
+                                origin_center = origin_box.center
+                                target_center = target_box.center
+                                push_controller.push_towards_target_direction(origin_center, target_center)
+                            
+                                logger.log("visual_push_success", {})
+                                print("Visual push complete")
+                            except Exception as e:
+                                logger.log("visual_push_error", {"error": str(e)})
+                                print("Error during visual push:", e)
+                        else:
+                            print("Cannot execute visual push: tip marker not visible")
+                            logger.log("visual_push_skip", {"reason": "tip_not_visible"})
+                        release_arm()
+                    else:
+                        # Scripted pick/place mode
                         logger.log(
-                            "visual_push_start",
+                            "pick_place_start",
                             {
-                                "origin_box": origin_box.__dict__,
-                                "target_box": target_box.__dict__,
+                                "origin_box": origin_box._asdict(),
+                                "target_box": target_box._asdict(),
                                 "object_center": object_center,
-                                "tip_center": tip_center,
                             },
                         )
-                        try:
-                            print("Visual push: Aligning tip to object...")
-                            # Align tip to object (simplified - in production, re-read vision each iteration)
-                            for i in range(10):
-                                aligned = push_controller.align_tip_to_object(tip_center, object_center)
-                                if aligned:
-                                    print(f"Aligned after {i+1} iterations")
-                                    break
-                                # In a real implementation, re-read tip_center and object_center here
-                            
-                            print("Visual push: Pushing towards target...")
-                            # Push from origin center towards target center
-                            origin_center = origin_box.center
-                            target_center = target_box.center
-                            push_controller.push_towards_target_direction(origin_center, target_center)
-                            
-                            logger.log("visual_push_success", {})
-                            print("Visual push complete")
-                        except Exception as e:
-                            logger.log("visual_push_error", {"error": str(e)})
-                            print("Error during visual push:", e)
-                    else:
-                        print("Cannot execute visual push: tip marker not visible")
-                        logger.log("visual_push_skip", {"reason": "tip_not_visible"})
-                else:
-                    # Scripted pick/place mode
-                    logger.log(
-                        "pick_place_start",
-                        {
-                            "origin_box": origin_box.__dict__,
-                            "target_box": target_box.__dict__,
-                            "object_center": object_center,
-                        },
-                    )
-                    try:
-                        controller.execute_pick_place()
-                        logger.log("pick_place_success", {})
-                    except Exception as e:
-                        logger.log("pick_place_error", {"error": str(e)})
-                        print("Error during pick & place:", e)
-                
-                busy = False
+                        # Logs the outcome and clears `busy` when the routine finishes
+                        executor.submit(controller.execute_pick_place).add_done_callback(on_pick_place_done)
+
+            profiler.report()
 
     finally:
+        if is_busy():
+            print("Waiting for pick & place to finish...")
+        executor.shutdown(wait=True)
         vision.release()
-        cv2.destroyAllWindows()
+        display.close()
+        arm.close()
+        profiler.report(force=True)
         logger.close()
 
 
@@ -1,26 +1,118 @@
 import json
+import queue
+import threading
 import time
 from pathlib import Path
 from typing import Any, Dict
 
+try:
+    import orjson  # optional: C-accelerated JSON encoder
+except ImportError:
+    orjson = None
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(record).decode("utf-8")
+    return json.dumps(record)
+
+
+# Control markers sent through the queue alongside records.
+_FLUSH = object()
+_STOP = object()
+
 
 class TelemetryLogger:
-    def __init__(self, path: str = "telemetry.log"):
+    """
+    Append-only JSONL event log.
+
+    log() serializes the event and enqueues the line; a background writer
+    thread writes lines in batches (up to `batch_size` events or
+    `batch_window` seconds) and flushes the file every `flush_interval`
+    seconds and on close, so the control loop never waits on disk I/O.
+    A payload that can't be encoded raises from log() itself; write errors
+    on the writer thread are reported and the thread keeps draining.
+    """
+
+    def __init__(
+        self,
+        path: str = "telemetry.log",
+        batch_size: int = 64,
+        batch_window: float = 0.05,
+        flush_interval: float = 1.0,
+    ):
         self.path = Path(path)
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        self.flush_interval = flush_interval
         # Append mode; create file if needed.
-        self._fh = self.path.open("a", encoding="utf-8")
+        self._fh = self.path.open("a", encoding="utf-8", buffering=8192)
+        self._q: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._drain, name="telemetry", daemon=True)
+        self._thread.start()
 
     def log(self, event_type: str, payload: Dict[str, Any]):
-        record = {
-            "ts": time.time(),
-            "type": event_type,
-            "data": payload,
-        }
-        self._fh.write(json.dumps(record) + "\n")
-        self._fh.flush()
+        if self._fh is None:
+            return
+        line = _dumps({"ts": time.time(), "type": event_type, "data": payload}) + "\n"
+        self._q.put_nowait(line)
+
+    def flush(self):
+        """Ask the writer to flush everything logged so far (doesn't wait)."""
+        if self._fh is not None:
+            self._q.put_nowait(_FLUSH)
+
+    def _drain(self):
+        fh = self._fh
+        dirty = False
+        last_flush = time.monotonic()
+        while True:
+            # Wake up for the periodic flush only when there's something to flush.
+            wait = max(0.0, last_flush + self.flush_interval - time.monotonic()) if dirty else None
+            try:
+                batch = [self._q.get(timeout=wait)]
+            except queue.Empty:
+                batch = []
+
+            # Collect whatever else arrives within the batch window.
+            deadline = time.monotonic() + self.batch_window
+            while batch and len(batch) < self.batch_size:
+                try:
+                    batch.append(self._q.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            lines = []
+            flush = stop = False
+            for item in batch:
+                if item is _FLUSH:
+                    flush = True
+                elif item is _STOP:
+                    stop = True
+                else:
+                    lines.append(item)
+            try:
+                if lines:
+                    fh.write("".join(lines))
+                    dirty = True
+
+                if dirty and (flush or stop or time.monotonic() - last_flush >= self.flush_interval):
+                    fh.flush()
+                    dirty = False
+                    last_flush = time.monotonic()
+            except (OSError, ValueError) as e:
+                # Drop this batch but keep the thread alive for later events.
+                print(f"Warning: telemetry write to {self.path} failed ({len(lines)} events dropped): {e}")
+                dirty = False
+                last_flush = time.monotonic()
+            if stop:
+                return
 
     def close(self):
+        """Write out every queued event, then close the file."""
         if self._fh:
+            self._q.put(_STOP)
+            self._thread.join()
             self._fh.close()
             self._fh = None
 
@@ -0,0 +1,99 @@
+import os
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Deque, Dict, Optional
+
+from .logger import TelemetryLogger
+
+# Handed out for every stage when profiling is off: no timing, no allocation.
+_NULL_STAGE = nullcontext()
+
+
+class Stage:
+    """Times one `with` block and records the duration on its profiler."""
+
+    __slots__ = ("_samples", "_start")
+
+    def __init__(self, samples: Deque[int]):
+        self._samples = samples
+        self._start = 0
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._samples.append(time.perf_counter_ns() - self._start)
+
+
+class Profiler:
+    """
+    Scoped per-stage timers for the main loop.
+
+    Wrap each stage in `with profiler.stage("detect_zones"):`. The last
+    `window` durations of every stage are kept in a ring buffer, and
+    report() logs their P50/P95/P99 (ms) as a "profile" telemetry event at
+    most every `report_every` seconds.
+
+    Enabled by the PROFILE environment variable (any value but "" or "0")
+    unless `enabled` is given; when disabled, stage() returns a shared no-op
+    context manager and report() returns immediately.
+    """
+
+    def __init__(
+        self,
+        logger: Optional[TelemetryLogger] = None,
+        window: int = 512,
+        report_every: float = 5.0,
+        enabled: Optional[bool] = None,
+    ):
+        if enabled is None:
+            enabled = os.environ.get("PROFILE", "0") not in ("", "0")
+        self.enabled = enabled
+        self.logger = logger
+        self.window = window
+        self.report_every = report_every
+        self._stages: Dict[str, Stage] = {}
+        self._samples: Dict[str, Deque[int]] = {}
+        self._last_report = time.monotonic()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        stage = self._stages.get(name)
+        if stage is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+            stage = self._stages[name] = Stage(samples)
+        return stage
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage sample count and P50/P95/P99 in milliseconds over the current window."""
+        out = {}
+        for name, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            last = len(ordered) - 1
+
+            def pct(p: float) -> float:
+                return round(ordered[round(p * last)] / 1e6, 3)
+
+            out[name] = {"n": len(ordered), "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
+        return out
+
+    def report(self, force: bool = False):
+        """Log the summary if report_every seconds have passed (or force)."""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.report_every:
+            return
+        self._last_report = now
+        summary = self.summary()
+        if not summary:
+            return
+        if self.logger is not None:
+            self.logger.log("profile", summary)
+        else:
+            print("profile:", summary)
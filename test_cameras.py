@@ -4,13 +4,23 @@ Press 'q' to move to the next camera, or ESC to exit.
 """
 import cv2
 import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from vision.camera import default_backend
 
 # Maximum camera index to scan (can be overridden via command line)
 MAX_CAMERA_INDEX = 5
 
+def open_camera(index):
+    # An explicit backend fails fast on missing indices instead of trying every one
+    backend = default_backend()
+    if backend is None:
+        return cv2.VideoCapture(index)
+    return cv2.VideoCapture(index, backend)
+
 def test_camera_index(index):
     """Test if a camera exists at the given index."""
-    cap = cv2.VideoCapture(index)
+    cap = open_camera(index)
     if not cap.isOpened():
         return False, None
     
@@ -35,9 +45,12 @@ def main():
     print(f"Scanning for available cameras (indices 0-{max_index})...")
     available_cameras = []
     
-    # Test indices 0 to max_index
-    for i in range(max_index + 1):
-        ret, frame = test_camera_index(i)
+    # Test indices 0 to max_index; opens block in the driver (GIL released), so probe
+    # several at once (at least one worker, and a bounded pool for large indices)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_index + 1, 8))) as ex:
+        results = list(ex.map(test_camera_index, range(max_index + 1)))
+
+    for i, (ret, frame) in enumerate(results):
         if ret:
             height, width = frame.shape[:2]
             print(f"✓ Camera {i}: Available ({width}x{height})")
@@ -54,7 +67,7 @@ def main():
     print("Press 'q' to move to next camera, or ESC to exit\n")
     
     for idx in available_cameras:
-        cap = cv2.VideoCapture(idx)
+        cap = open_camera(idx)
         if not cap.isOpened():
             continue
             
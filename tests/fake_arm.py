@@ -0,0 +1,126 @@
+"""
+A stand-in for the RoArm-M2-S HTTP interface, served from a local thread.
+
+Joints move from where they are towards each commanded target at a fixed
+rate after a short start-up delay, so feedback polls can catch a move
+before it starts, halfway through, or done. The clamp can be made to stop
+short (closing on an object). x/y/z are a fixed linear function of the
+base/shoulder/elbow angles, so every joint pose has one cartesian pose.
+"""
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+MM_PER_RAD = 100.0
+
+
+def xyz_of(b: float, s: float, e: float):
+    return (b * MM_PER_RAD, s * MM_PER_RAD, e * MM_PER_RAD)
+
+
+class _Joint:
+    def __init__(self, value: float):
+        self.start = self.target = value
+        self.t0 = 0.0
+
+    def at(self, now: float, rate: float, delay: float) -> float:
+        travel = max(0.0, now - self.t0 - delay) * rate
+        if abs(self.target - self.start) <= travel:
+            return self.target
+        return self.start + math.copysign(travel, self.target - self.start)
+
+    def move(self, target: float, now: float, rate: float, delay: float):
+        self.start = self.at(now, rate, delay)
+        self.target = target
+        self.t0 = now
+
+
+class FakeArm:
+    """
+    rate: joint speed in rad/s; delay: seconds before a commanded move starts.
+    clamp_stop: where the clamp stops when closing past it (None: never).
+    drop_keepalive: close every connection after one response without a
+    "Connection: close" header, like the arm dropping an idle session.
+    """
+
+    def __init__(
+        self,
+        rate: float = math.radians(600),
+        delay: float = 0.05,
+        clamp_stop: Optional[float] = None,
+        drop_keepalive: bool = False,
+    ):
+        self.rate = rate
+        self.delay = delay
+        self.clamp_stop = clamp_stop
+        self.drop_keepalive = drop_keepalive
+        self.commands: List[Dict[str, Any]] = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._joints = [_Joint(0.0), _Joint(0.0), _Joint(math.pi / 2), _Joint(1.2)]
+
+        arm = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                cmd = json.loads(parse_qs(urlparse(self.path).query)["json"][0])
+                body = arm._handle(cmd, self.client_address).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                if arm.drop_keepalive:
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self.address = f"127.0.0.1:{self._server.server_port}"
+        threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def _handle(self, cmd: Dict[str, Any], client) -> str:
+        now = time.monotonic()
+        with self._lock:
+            self.commands.append(cmd)
+            self.connections.add(client)
+            t = cmd.get("T")
+            if t == 122:
+                targets = [math.radians(cmd[k]) for k in ("b", "s", "e", "h")]
+            elif t == 106:
+                targets = [None, None, None, cmd["cmd"]]
+            elif t == 104:
+                targets = [cmd["x"] / MM_PER_RAD, cmd["y"] / MM_PER_RAD, cmd["z"] / MM_PER_RAD, None]
+            elif t == 100:
+                targets = [0.0, 0.0, math.pi / 2, math.pi]
+            elif t == 105:
+                return json.dumps(self._feedback(now))
+            else:
+                return "{}"
+            if self.clamp_stop is not None and targets[3] is not None:
+                targets[3] = min(targets[3], self.clamp_stop)
+            for joint, target in zip(self._joints, targets):
+                if target is not None:
+                    joint.move(target, now, self.rate, self.delay)
+            return "{}"
+
+    def _feedback(self, now: float) -> Dict[str, Any]:
+        b, s, e, t = (j.at(now, self.rate, self.delay) for j in self._joints)
+        x, y, z = xyz_of(b, s, e)
+        return {"T": 1051, "x": x, "y": y, "z": z, "b": b, "s": s, "e": e, "t": t}
+
+    def sent(self, t: int) -> List[Dict[str, Any]]:
+        """Commands of type T received so far."""
+        with self._lock:
+            return [c for c in self.commands if c.get("T") == t]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
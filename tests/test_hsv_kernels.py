@@ -0,0 +1,58 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from vision._numba import NUMBA_AVAILABLE
+
+# (lower, upper) HSV ranges from config/settings.yaml
+BLUE = ([100, 120, 70], [130, 255, 255])
+RED = ([0, 120, 70], [10, 255, 255])
+PINK = ([140, 80, 80], [170, 255, 255])
+
+
+def _frames():
+    rng = np.random.default_rng(0)
+    yield rng.integers(0, 256, (240, 320, 3), dtype=np.uint8)
+    # Greys, pure primaries and other ties where the hue formula branches.
+    levels = np.array([0, 1, 127, 128, 254, 255], np.uint8)
+    yield np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), -1).reshape(-1, 6, 3)
+
+
+def _bounds(lower, upper):
+    return np.array(lower, np.uint8), np.array(upper, np.uint8)
+
+
+@unittest.skipUnless(NUMBA_AVAILABLE, "numba not installed")
+class HsvKernelTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        from vision import _hsv_kernels
+
+        cls.kernels = _hsv_kernels
+
+    def test_two_masks_match_cvtcolor_inrange(self):
+        blue, red = _bounds(*BLUE), _bounds(*RED)
+        for frame in _frames():
+            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+            blue_out = np.empty(frame.shape[:2], np.uint8)
+            red_out = np.empty(frame.shape[:2], np.uint8)
+            self.kernels.bgr_to_two_masks(frame, *blue, *red, blue_out, red_out)
+            np.testing.assert_array_equal(blue_out, cv2.inRange(hsv, *blue))
+            np.testing.assert_array_equal(red_out, cv2.inRange(hsv, *red))
+
+    def test_detect_blob_matches_inrange_stats(self):
+        lo, hi = _bounds(*PINK)
+        frame = next(_frames())
+        # Full frame and a non-contiguous ROI crop, as the detectors pass.
+        for view in (frame, frame[17:201, 33:290]):
+            mask = cv2.inRange(cv2.cvtColor(view, cv2.COLOR_BGR2HSV), lo, hi)
+            ys, xs = np.nonzero(mask)
+            x, y, w, h = cv2.boundingRect(cv2.findNonZero(mask))
+            expected = (int(xs.sum() / len(xs)), int(ys.sum() / len(ys)), x, y, w, h)
+            self.assertEqual(self.kernels.detect_blob(view, lo, hi, 1), expected)
+            self.assertIsNone(self.kernels.detect_blob(view, lo, hi, len(xs) + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
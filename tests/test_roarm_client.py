@@ -0,0 +1,120 @@
+import math
+import time
+import unittest
+
+from arm.roarm_client import RoArmClient
+from controller.pick_place import PickPlaceConfig, PickPlaceController
+from tests.fake_arm import FakeArm, xyz_of
+
+
+class _FakeArmCase(unittest.TestCase):
+    def _client(self, **arm_kwargs):
+        arm = FakeArm(**arm_kwargs)
+        self.addCleanup(arm.close)
+        client = RoArmClient(arm.address)
+        self.addCleanup(client.close)
+        return arm, client
+
+
+class KeepAliveTest(_FakeArmCase):
+    def test_commands_share_one_connection(self):
+        arm, client = self._client()
+        for _ in range(3):
+            client.get_feedback()
+        self.assertEqual(len(arm.sent(105)), 3)
+        self.assertEqual(len(arm.connections), 1)
+
+    def test_reconnects_after_dropped_keepalive(self):
+        arm, client = self._client(drop_keepalive=True)
+        for _ in range(3):
+            fb = client.get_feedback()
+            self.assertEqual(fb["T"], 1051)
+        self.assertEqual(len(arm.sent(105)), 3)
+        self.assertEqual(len(arm.connections), 3)
+
+    def test_network_error_raises_runtime_error(self):
+        arm = FakeArm()
+        address = arm.address
+        arm.close()
+        client = RoArmClient(address)
+        self.addCleanup(client.close)
+        with self.assertRaises(RuntimeError):
+            client.move_init()
+
+
+class WaitUntilSettledTest(_FakeArmCase):
+    def _wait(self, client, timeout=2.0):
+        start = time.monotonic()
+        settled = client.wait_until_settled(poll_interval=0.01, timeout=timeout)
+        return settled, time.monotonic() - start
+
+    def test_waits_for_joint_move_to_reach_target(self):
+        # Slow enough that polls land before the move starts and mid-way.
+        arm, client = self._client(rate=math.radians(300), delay=0.1)
+        client.move_joints_deg(0, 77, 90, 69)
+        settled, _ = self._wait(client)
+        self.assertTrue(settled)
+        fb = client.get_feedback()
+        self.assertAlmostEqual(fb["s"], math.radians(77), places=3)
+
+    def test_times_out_when_target_is_never_reached(self):
+        arm, client = self._client(rate=0.0)
+        client.move_joints_deg(0, 45, 90, 69)
+        settled, elapsed = self._wait(client, timeout=0.3)
+        self.assertFalse(settled)
+        self.assertGreaterEqual(elapsed, 0.25)
+
+    def test_clamp_stopping_short_counts_as_settled(self):
+        arm, client = self._client(clamp_stop=2.5, delay=0.0)
+        client.get_feedback()  # the clamp's position before the command
+        client.close_grip(3.14)
+        time.sleep(0.05)  # clamp already stopped by the first poll
+        settled, elapsed = self._wait(client)
+        self.assertTrue(settled)
+        self.assertLess(elapsed, 0.5)
+
+    def test_cartesian_move_without_joint_motion_settles(self):
+        arm, client = self._client()
+        x, y, z = xyz_of(0.0, 0.0, math.pi / 2)
+        client.move_cartesian(x, y, z, 1.2)
+        settled, elapsed = self._wait(client)
+        self.assertTrue(settled)
+        self.assertLess(elapsed, 0.5)
+
+
+class PoseCacheTest(_FakeArmCase):
+    def test_mid_motion_feedback_is_not_cached(self):
+        arm, client = self._client(rate=math.radians(100), delay=0.0)
+        client.move_joints_deg(0, 60, 90, 69)
+        client.get_feedback()
+        self.assertIsNone(client.last_xyzt)
+        self.assertTrue(client.wait_until_settled(poll_interval=0.01))
+        self.assertEqual(client.last_xyzt[:3], xyz_of(0.0, math.radians(60), math.pi / 2))
+
+    def test_lift_reuses_pose_measured_at_target(self):
+        arm, client = self._client()
+        cfg = PickPlaceConfig(
+            pose_home=[0, 0, 90, 69],
+            pose_above_origin=[10, 30, 80, 69],
+            pose_pick_origin=[10, 40, 70, 69],
+            pose_above_target=[-10, 30, 80, 69],
+            pose_place_target=[-10, 40, 70, 69],
+            spd=30, acc=30, grip_closed_rad=3.0, grip_open_rad=1.2,
+            z_lift=50, settle_on_feedback=True, settle_timeout=2.0,
+        )
+        controller = PickPlaceController(client, cfg)
+        controller._run_segment(controller._cmd_above_origin)
+        polls = len(arm.sent(105))
+        controller._lift_z(cfg.z_lift)
+
+        # No extra feedback round-trip: the settle already measured the pose.
+        self.assertEqual(len(arm.sent(105)), polls)
+        x, y, z = xyz_of(math.radians(10), math.radians(30), math.radians(80))
+        lift = arm.sent(104)[-1]
+        self.assertAlmostEqual(lift["x"], x)
+        self.assertAlmostEqual(lift["y"], y)
+        self.assertAlmostEqual(lift["z"], z + cfg.z_lift)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# vision/_hsv_kernels.py
+"""
+Optional Numba kernels for the per-frame HSV thresholding.
+
+The HSV math mirrors OpenCV's 8-bit COLOR_BGR2HSV (H in 0..179) including its
+fixed-point division tables, so masks match cv2.cvtColor + cv2.inRange.
+Numba is optional, and importing this module imports it, so callers check
+vision._numba.NUMBA_AVAILABLE first and only load the kernels when they are
+asked for; NUMBA_AVAILABLE here says whether the import actually worked.
+
+Threshold ranges are folded into per-channel lookup tables (see zone_luts)
+so each pixel costs three table reads instead of twelve comparisons.
+detect_blob fuses conversion, thresholding and the centroid/bbox reduction
+for the single-colour detectors (tip marker, object).
+"""
+from typing import Dict, Tuple
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # Kernels stay importable (as slow pure Python) when Numba is missing.
+        def wrap(fn):
+            return fn
+        return wrap
+
+
+_HSV_SHIFT = 12
+_HSV_ROUND = 1 << (_HSV_SHIFT - 1)
+
+# Same tables OpenCV builds for RGB2HSV_b: 255/v and 180/(6*diff) in Q12.
+_i = np.arange(256, dtype=np.float64)
+_i[0] = 1.0
+_SDIV = np.rint((255 << _HSV_SHIFT) / _i).astype(np.int32)
+_HDIV = np.rint((180 << _HSV_SHIFT) / (6.0 * _i)).astype(np.int32)
+_SDIV[0] = 0
+_HDIV[0] = 0
+del _i
+
+
+@njit(inline="always", fastmath=True)
+def _bgr_pixel_to_hsv(b, g, r):
+    """OpenCV's 8-bit BGR2HSV for one pixel (int32 inputs), branch-free."""
+    v = max(b, max(g, r))
+    diff = v - min(b, min(g, r))
+    vr = -np.int32(v == r)
+    vg = -np.int32(v == g)
+
+    s = (diff * _SDIV[v] + _HSV_ROUND) >> _HSV_SHIFT
+    h = (vr & (g - b)) + (~vr & ((vg & (b - r + 2 * diff)) + ((~vg) & (r - g + 4 * diff))))
+    h = (h * _HDIV[diff] + _HSV_ROUND) >> _HSV_SHIFT
+    h += (h >> 31) & 180  # wrap negative hues
+    return h, s, v
+
+
+_BLUE_BIT = 1
+_RED_BIT = 2
+
+_lut_cache: Dict[bytes, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def zone_luts(bl, bu, rl, ru) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-channel (H, S, V) 256-entry tables with bit 0 set where a value is in
+    the blue range and bit 1 where it is in the red range.
+
+    Thresholds come from config and don't change between frames, so the
+    tables are built once per distinct set of ranges and cached.
+    """
+    key = np.concatenate([np.asarray(a, np.uint8) for a in (bl, bu, rl, ru)]).tobytes()
+    luts = _lut_cache.get(key)
+    if luts is None:
+        i = np.arange(256)
+        luts = tuple(
+            (((bl[c] <= i) & (i <= bu[c])) * _BLUE_BIT | ((rl[c] <= i) & (i <= ru[c])) * _RED_BIT).astype(np.uint8)
+            for c in range(3)
+        )
+        _lut_cache[key] = luts
+    return luts
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _bgr_to_two_masks(frame, lut_h, lut_s, lut_v, blue_out, red_out):
+    for y in prange(frame.shape[0]):
+        row = frame[y]
+        blue_row = blue_out[y]
+        red_row = red_out[y]
+        for x in range(frame.shape[1]):
+            h, s, v = _bgr_pixel_to_hsv(np.int32(row[x, 0]), np.int32(row[x, 1]), np.int32(row[x, 2]))
+            bits = np.int32(lut_h[h] & lut_s[s] & lut_v[v])
+            blue_row[x] = np.uint8(-(bits & 1) & 255)
+            red_row[x] = np.uint8(-((bits >> 1) & 1) & 255)
+
+
+def bgr_to_two_masks(frame, bl, bu, rl, ru, blue_out, red_out):
+    """
+    One pass over a BGR frame producing two cv2.inRange-style masks.
+
+    Equivalent to cvtColor(BGR2HSV) followed by inRange(bl, bu) and
+    inRange(rl, ru), without materializing the HSV image or re-reading it.
+    The per-pixel math is branch-free apart from the table lookups.
+    """
+    lut_h, lut_s, lut_v = zone_luts(bl, bu, rl, ru)
+    _bgr_to_two_masks(frame, lut_h, lut_s, lut_v, blue_out, red_out)
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _blob_rows(frame, lo, hi, count, sum_x, min_x, max_x):
+    l0, l1, l2 = np.int32(lo[0]), np.int32(lo[1]), np.int32(lo[2])
+    u0, u1, u2 = np.int32(hi[0]), np.int32(hi[1]), np.int32(hi[2])
+    width = frame.shape[1]
+    for y in prange(frame.shape[0]):
+        row = frame[y]
+        n = 0
+        sx = 0
+        first = width
+        last = -1
+        for x in range(width):
+            h, s, v = _bgr_pixel_to_hsv(np.int32(row[x, 0]), np.int32(row[x, 1]), np.int32(row[x, 2]))
+            hit = np.int32((l0 <= h) & (h <= u0) & (l1 <= s) & (s <= u1) & (l2 <= v) & (v <= u2))
+            n += hit
+            sx += hit * x
+            if hit:
+                first = min(first, x)
+                last = x
+        count[y] = n
+        sum_x[y] = sx
+        min_x[y] = first
+        max_x[y] = last
+
+
+def detect_blob(frame, lo, hi, min_area):
+    """
+    One pass over a BGR frame: HSV conversion, inRange(lo, hi) and the
+    pixel count, centroid and bounding box of everything in range.
+
+    Rows are processed in parallel into per-row partial sums, which are then
+    reduced here. Returns (cx, cy, x, y, w, h) as ints, or None if fewer than
+    min_area pixels match. Unlike the OpenCV path there is no morphology or
+    connected-component split: all matching pixels count as one blob.
+    """
+    height = frame.shape[0]
+    count = np.empty(height, np.int64)
+    sum_x = np.empty(height, np.int64)
+    min_x = np.empty(height, np.int64)
+    max_x = np.empty(height, np.int64)
+    _blob_rows(frame, lo, hi, count, sum_x, min_x, max_x)
+
+    total = int(count.sum())
+    if total == 0 or total < min_area:
+        return None
+    rows = np.flatnonzero(count)
+    y0, y1 = int(rows[0]), int(rows[-1])
+    x0, x1 = int(min_x[rows].min()), int(max_x[rows].max())
+    cx = int(sum_x.sum() / total)
+    cy = int((count * np.arange(height)).sum() / total)
+    return cx, cy, x0, y0, x1 - x0 + 1, y1 - y0 + 1
+
+
+def warmup():
+    """Compile (or load from the on-disk cache) every kernel up front, so the first live frame doesn't pay for it."""
+    if not NUMBA_AVAILABLE:
+        return
+    frame = np.zeros((8, 8, 3), np.uint8)
+    lo = np.zeros(3, np.uint8)
+    hi = np.full(3, 255, np.uint8)
+    # Bounds arrive read-only from RangeDetector, and Numba specializes on that.
+    lo.setflags(write=False)
+    hi.setflags(write=False)
+    out = np.empty((8, 8), np.uint8)
+    bgr_to_two_masks(frame, lo, hi, lo, hi, out, out.copy())
+    detect_blob(frame, lo, hi, 1)
+    detect_blob(frame[1:, 1:], lo, hi, 1)  # ROI crops are non-contiguous views
@@ -0,0 +1,9 @@
+# vision/_numba.py
+"""
+Whether the optional Numba kernels can be used, checked without importing
+numba (which alone takes a few hundred ms). vision._hsv_kernels, which does
+import it, is only loaded by the code paths that run with use_numba.
+"""
+import importlib.util
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
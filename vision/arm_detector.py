@@ -3,45 +3,82 @@ import cv2
 import numpy as np
 from typing import Optional, Tuple
 
+from ._numba import NUMBA_AVAILABLE
+from .grid_detector import clamp_window, largest_component
+from .scratch import VisionScratch
+from .specialize import RangeDetector
+
+# 3x3 structuring element for the open/close noise cleanup, built once
+_MORPH_K = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+
+def _find_tip(frame_bgr, hsv, tip_range, min_area, scratch, x0, y0, x1, y1, use_numba=False) -> Optional[Tuple[int, int]]:
+    """Search one window of the frame; the centroid is returned in full-frame coordinates."""
+    if use_numba:
+        from . import _hsv_kernels  # deferred: importing the kernels pulls in numba
+
+        blob = _hsv_kernels.detect_blob(frame_bgr[y0:y1, x0:x1], tip_range.lower, tip_range.upper, min_area)
+        return None if blob is None else (x0 + blob[0], y0 + blob[1])
+
+    h, w = y1 - y0, x1 - x0
+    if hsv is not None:
+        hsv_roi = hsv[y0:y1, x0:x1]
+    else:
+        hsv_roi = cv2.cvtColor(frame_bgr[y0:y1, x0:x1], cv2.COLOR_BGR2HSV, dst=scratch.hsv[:h, :w])
+    mask = tip_range(hsv_roi, scratch.pink_mask[:h, :w])
+
+    # Clean up noise with morphological operations
+    morph = scratch.morph[:h, :w]
+    cv2.morphologyEx(mask, cv2.MORPH_OPEN, _MORPH_K, dst=morph, iterations=1)
+    cv2.morphologyEx(morph, cv2.MORPH_CLOSE, _MORPH_K, dst=mask, iterations=1)
+
+    found = largest_component(mask, min_area, scratch.labels[:h, :w])
+    if found is None:
+        return None
+    cx, cy = found[1]
+    return x0 + cx, y0 + cy
+
 
 def detect_tip(
     frame_bgr: np.ndarray,
-    lower_hsv: np.ndarray,
-    upper_hsv: np.ndarray,
+    tip_range: RangeDetector,
     min_area: int = 50,
+    hsv: Optional[np.ndarray] = None,
+    scratch: Optional[VisionScratch] = None,
+    *,
+    last_center: Optional[Tuple[int, int]] = None,
+    window: int = 128,
+    use_numba: bool = False,
 ) -> Optional[Tuple[int, int]]:
     """
     Detect the pink marker on the robot arm's end effector (gripper tip).
     
     Args:
         frame_bgr: Input frame in BGR color space
-        lower_hsv: Lower HSV threshold for pink marker
-        upper_hsv: Upper HSV threshold for pink marker
-        min_area: Minimum contour area to consider as valid marker
+        tip_range: HSV range of the pink marker (see make_range_detector)
+        min_area: Minimum blob area (pixels) to consider as valid marker
+        hsv: Optional frame_bgr already converted to HSV; skips the conversion
+        scratch: Optional preallocated buffers to write intermediates into
+        last_center: Previous tip position; if given, only a +/-window px box
+            around it is searched first, falling back to the full frame
+        window: Half-size of that search box in pixels
+        use_numba: Use the fused Numba kernel (if installed) straight on the
+            BGR pixels; hsv is ignored and there's no morphology/blob split
         
     Returns:
         (cx, cy) tuple of marker center in image coordinates, or None if not found
     """
-    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, lower_hsv, upper_hsv)
-
-    # Clean up noise with morphological operations
-    kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=1)
-
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
-        return None
-
-    largest = max(contours, key=cv2.contourArea)
-    if cv2.contourArea(largest) < min_area:
-        return None
+    use_numba = use_numba and NUMBA_AVAILABLE
+    if scratch is None and not use_numba:
+        scratch = VisionScratch.for_frame(frame_bgr)
+    height, width = frame_bgr.shape[:2]
 
-    M = cv2.moments(largest)
-    if M["m00"] == 0:
-        return None
+    if last_center is not None:
+        cx, cy = last_center
+        win = clamp_window(frame_bgr.shape, cx - window, cy - window, cx + window, cy + window)
+        if win is not None:
+            found = _find_tip(frame_bgr, hsv, tip_range, min_area, scratch, *win, use_numba)
+            if found is not None:
+                return found
 
-    cx = int(M["m10"] / M["m00"])
-    cy = int(M["m01"] / M["m00"])
-    return cx, cy
+    return _find_tip(frame_bgr, hsv, tip_range, min_area, scratch, 0, 0, width, height, use_numba)
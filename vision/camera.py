@@ -1,18 +1,36 @@
 import cv2
+import queue
 import sys
+import threading
+import time
+
+# A grab() that takes longer than this waited on the camera for a new frame,
+# meaning nothing older was left buffered.
+_FRESH_GRAB_S = 0.004
+
+
+def default_backend() -> int | None:
+    """Capture backend to ask for explicitly on this platform (None = let OpenCV probe)."""
+    if sys.platform.startswith("win"):
+        return cv2.CAP_DSHOW
+    if sys.platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    return None
 
 
 class VisionSensor:
-    def __init__(self, camera_index: int = 0, width: int | None = None, height: int | None = None, backend: int | None = None):
+    def __init__(
+        self,
+        camera_index: int = 0,
+        width: int | None = None,
+        height: int | None = None,
+        backend: int | None = None,
+        max_drain: int = 4,
+    ):
         # Select backend automatically if not provided
         if backend is None:
-            if sys.platform.startswith("win"):
-                backend = cv2.CAP_DSHOW
-            elif sys.platform.startswith("linux"):
-                backend = cv2.CAP_V4L2
-            else:
-                backend = None  # Use default backend
-        
+            backend = default_backend()
+
         if backend is not None:
             self.cap = cv2.VideoCapture(camera_index, backend)
         else:
@@ -22,12 +40,29 @@ class VisionSensor:
             self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         if height is not None:
             self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        # Keep the driver queue short; not every backend honours this.
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
 
         if not self.cap.isOpened():
             raise RuntimeError(f"Failed to open camera index {camera_index}")
 
+        self.max_drain = max(1, max_drain)
+
     def get_frame(self):
-        ret, frame = self.cap.read()
+        """
+        Return the most recent frame, skipping any that queued up meanwhile.
+
+        Buffered frames are grab()bed without decoding, up to max_drain of
+        them; draining stops as soon as a grab has to wait for the camera,
+        since that frame is already the newest. Only the last one is decoded.
+        """
+        for _ in range(self.max_drain):
+            start = time.perf_counter()
+            if not self.cap.grab():
+                return None
+            if time.perf_counter() - start > _FRESH_GRAB_S:
+                break
+        ret, frame = self.cap.retrieve()
         if not ret:
             return None
         return frame
@@ -42,3 +77,85 @@ class VisionSensor:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.release()
+
+
+class ThreadedVisionSensor:
+    """
+    Runs VisionSensor capture on a daemon thread, feeding a single-slot queue.
+
+    The producer overwrites any frame the consumer hasn't taken yet, so
+    get_frame() always hands out the freshest capture and camera I/O and
+    decode overlap with detection work on the main thread. Every capture is
+    stamped with an increasing frame id (see get_frame_with_id()).
+    """
+
+    def __init__(self, sensor: VisionSensor, timeout: float = 1.0):
+        self._sensor = sensor
+        self._timeout = timeout
+        self._slot: queue.Queue = queue.Queue(maxsize=1)
+        self._stop = threading.Event()
+        self._last = (0, None)
+        self._thread = threading.Thread(target=self._capture_loop, name="capture", daemon=True)
+        self._thread.start()
+
+    def _put_latest(self, item):
+        # Only the capture thread puts while it runs, so after dropping the
+        # stale entry put() cannot block.
+        try:
+            self._slot.get_nowait()
+        except queue.Empty:
+            pass
+        self._slot.put(item)
+
+    def _capture_loop(self):
+        frame_id = 0
+        while not self._stop.is_set():
+            frame = self._sensor.get_frame()
+            if frame is None:
+                break
+            frame_id += 1
+            self._put_latest((frame_id, frame))
+        # Camera stopped delivering (or we were released): wake the consumer with None.
+        self._stop.set()
+        self._put_latest((frame_id + 1, None))
+
+    def get_frame_with_id(self, timeout: float | None = None):
+        """
+        Return (frame_id, frame) for the next fresh frame.
+
+        If no new frame arrives within timeout seconds (default: the
+        constructor's), the previous (frame_id, frame) is returned again, so
+        callers can spot the repeat by its id. Until the first frame has
+        arrived it keeps waiting instead (cameras can take a while to start).
+        frame is None only once capture has stopped.
+        """
+        timeout = self._timeout if timeout is None else timeout
+        while True:
+            try:
+                item = self._slot.get(timeout=timeout)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return (self._last[0], None)
+                if self._last[1] is not None:
+                    return self._last
+        if item[1] is None:
+            # Leave the sentinel for any later call.
+            self._put_latest(item)
+        self._last = item
+        return item
+
+    def get_frame(self, timeout: float | None = None):
+        """Return the next fresh frame (or the previous one on timeout); None once capture has stopped."""
+        return self.get_frame_with_id(timeout)[1]
+
+    def release(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self._sensor.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,141 @@
+import queue
+import sys
+import threading
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class DisplayThread:
+    """
+    Shows annotated frames on a dedicated GUI thread.
+
+    cv2.imshow/cv2.waitKey run here instead of in the capture+detect loop, so
+    the GUI pump never stalls detection. Only the newest frame is kept; key
+    presses are handed back to the main loop through poll_key(), which also
+    re-raises any error that stopped the GUI thread.
+
+    Frames wider than max_width are downscaled (aspect preserved) before
+    imshow; detection keeps working on the full-resolution original.
+    """
+
+    def __init__(self, window_name: str = "Overhead View", max_width: Optional[int] = 640):
+        self.window_name = window_name
+        self.max_width = max_width
+        self._frames: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=1)
+        self._keys: "queue.Queue[int]" = queue.Queue()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="display", daemon=True)
+        self._thread.start()
+
+    def show(self, frame: np.ndarray):
+        """Queue a frame for display, replacing one that hasn't been shown yet."""
+        try:
+            self._frames.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._frames.put_nowait(frame)
+        except queue.Full:
+            pass  # display thread is behind; drop this frame
+
+    def poll_key(self) -> Optional[int]:
+        """
+        Return the next key pressed in the window (already masked to 0-255), or None.
+
+        Raises the GUI thread's exception if imshow/waitKey failed, so the
+        main loop shuts down as it would have with the calls inline.
+        """
+        if self._error is not None:
+            raise RuntimeError(f"Display thread failed: {self._error}") from self._error
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _fit(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if not self.max_width or w <= self.max_width:
+            return frame
+        size = (self.max_width, max(1, round(h * self.max_width / w)))
+        return cv2.resize(frame, size, interpolation=cv2.INTER_NEAREST)
+
+    def _run(self):
+        try:
+            self._pump()
+        except Exception as e:
+            self._error = e
+
+    def _pump(self):
+        window_open = False
+        while not self._stop.is_set():
+            try:
+                frame = self._frames.get(timeout=0.05)
+            except queue.Empty:
+                frame = None
+
+            if frame is not None:
+                cv2.imshow(self.window_name, self._fit(frame))
+                window_open = True
+            if not window_open:
+                continue
+
+            key = cv2.waitKey(1) & 0xFF
+            if key != 0xFF:
+                self._keys.put(key)
+
+        # Windows must be torn down by the thread that created them.
+        cv2.destroyAllWindows()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class HeadlessDisplay:
+    """
+    Drop-in stand-in for DisplayThread when running without a window.
+
+    show() discards frames, so no GUI calls happen at all. Keys come from
+    stdin instead: each character of a typed line (e.g. "h" + Enter) is
+    queued for poll_key(); "q" is reported as ESC. At end-of-input (e.g.
+    stdin is /dev/null under a service manager) key reading simply stops,
+    leaving Ctrl-C to quit.
+    """
+
+    def __init__(self):
+        self._keys: "queue.Queue[int]" = queue.Queue()
+        # stdin reads block, so they get their own daemon thread.
+        self._thread = threading.Thread(target=self._read_stdin, name="stdin-keys", daemon=True)
+        self._thread.start()
+
+    def show(self, frame: np.ndarray):
+        pass
+
+    def poll_key(self) -> Optional[int]:
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _read_stdin(self):
+        for line in sys.stdin:
+            for ch in line.strip():
+                self._keys.put(27 if ch in "qQ" else ord(ch) & 0xFF)
+
+    def close(self):
+        pass  # the reader thread is a daemon blocked on stdin
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,11 +1,15 @@
 import cv2
 import numpy as np
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional, Tuple
 
+from ._numba import NUMBA_AVAILABLE
+from .scratch import VisionScratch
+from .specialize import RangeDetector
 
-@dataclass
-class Box:
+
+class Box(NamedTuple):
+    """Axis-aligned box of plain ints; a tuple, so it unpacks as x, y, w, h."""
     x: int
     y: int
     w: int
@@ -13,54 +17,173 @@ class Box:
 
     @property
     def center(self) -> Tuple[int, int]:
-        return (self.x + self.w // 2, self.y + self.h // 2)
+        x, y, w, h = self
+        return (x + w // 2, y + h // 2)
+
+    def scaled(self, factor: float) -> "Box":
+        """Return this box mapped into an image resized by `factor`."""
+        x, y, w, h = self
+        return Box(round(x * factor), round(y * factor), round(w * factor), round(h * factor))
+
+    def as_array(self) -> np.ndarray:
+        """(x, y, w, h) as an int32 array, for vectorized transforms."""
+        return np.array(self, dtype=np.int32)
+
+
+def largest_component(
+    mask: np.ndarray, min_area: int, labels: Optional[np.ndarray] = None, by_box_area: bool = False
+) -> Optional[Tuple[Box, Tuple[int, int]]]:
+    """
+    Find the largest 8-connected blob in a binary mask in a single C pass.
 
+    Returns (bounding box, integer centroid) of the blob, or None if the mask
+    is empty or the blob covers fewer than min_area pixels. The centroid comes
+    straight from the labelling stats, so no separate moments pass is needed.
+    labels optionally supplies an int32 buffer of mask's shape for the label
+    image, which is otherwise allocated per call and discarded.
 
-def _largest_contour_box(mask: np.ndarray, min_area: int) -> Optional[Box]:
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
+    With by_box_area, blobs are ranked (and min_area is checked) by their
+    bounding-box area instead of their pixel count. That suits hollow
+    shapes such as the taped zone outlines, whose pixel count is only the
+    tape, so a small solid blob would otherwise beat them.
+    """
+    n, _, stats, centroids = cv2.connectedComponentsWithStats(
+        mask, labels=labels, connectivity=8, ltype=cv2.CV_32S
+    )
+    if n <= 1:  # label 0 is the background
         return None
 
-    largest = max(contours, key=cv2.contourArea)
-    area = cv2.contourArea(largest)
-    if area < min_area:
+    if by_box_area:
+        areas = stats[1:, cv2.CC_STAT_WIDTH] * stats[1:, cv2.CC_STAT_HEIGHT]
+    else:
+        areas = stats[1:, cv2.CC_STAT_AREA]
+    idx = int(areas.argmax())
+    if areas[idx] < min_area:
         return None
+    idx += 1
+
+    # Plain ints so results stay JSON/telemetry friendly
+    x, y, w, h = (int(v) for v in stats[idx, cv2.CC_STAT_LEFT:cv2.CC_STAT_HEIGHT + 1])
+    cx, cy = centroids[idx]
+    return Box(x, y, w, h), (int(cx), int(cy))
 
-    x, y, w, h = cv2.boundingRect(largest)
-    return Box(x, y, w, h)
+
+def clamp_window(shape: Tuple[int, ...], x0: int, y0: int, x1: int, y1: int) -> Optional[Tuple[int, int, int, int]]:
+    """Clip a window to an image of the given shape; None if nothing is left."""
+    x0, y0 = max(0, x0), max(0, y0)
+    x1, y1 = min(shape[1], x1), min(shape[0], y1)
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+def _largest_blob_box(mask: np.ndarray, min_area: int, labels: Optional[np.ndarray] = None) -> Optional[Box]:
+    # Zones are tape outlines: rank by the area they enclose, not the tape's.
+    found = largest_component(mask, min_area, labels, by_box_area=True)
+    return found[0] if found else None
+
+
+# Blue and red zones are independent: one runs here, the other on the
+# calling thread. OpenCV drops the GIL, so both proceed on separate cores.
+_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="zones")
+
+
+def _zone_from_hsv(
+    hsv: np.ndarray,
+    color_range: RangeDetector,
+    mask: np.ndarray,
+    min_area: int,
+    last_box: Optional[Box] = None,
+    margin: int = 32,
+    labels: Optional[np.ndarray] = None,
+) -> Optional[Box]:
+    # Zones are taped down, so first look only around where it was last seen.
+    if last_box is not None:
+        win = clamp_window(
+            hsv.shape, last_box.x - margin, last_box.y - margin,
+            last_box.x + last_box.w + margin, last_box.y + last_box.h + margin,
+        )
+        if win is not None:
+            x0, y0, x1, y1 = win
+            h, w = y1 - y0, x1 - x0
+            sub = color_range(hsv[y0:y1, x0:x1], mask[:h, :w])
+            box = _largest_blob_box(sub, min_area, None if labels is None else labels[:h, :w])
+            # A blob touching an inner window edge may continue outside it.
+            if box is not None and not (
+                (box.x == 0 and x0 > 0)
+                or (box.y == 0 and y0 > 0)
+                or (box.x + box.w == x1 - x0 and x1 < hsv.shape[1])
+                or (box.y + box.h == y1 - y0 and y1 < hsv.shape[0])
+            ):
+                return Box(box.x + x0, box.y + y0, box.w, box.h)
+
+    return _largest_blob_box(color_range(hsv, mask), min_area, labels)
 
 
 def detect_zones(
     frame_bgr: np.ndarray,
-    blue_lower: np.ndarray,
-    blue_upper: np.ndarray,
-    red_lower: np.ndarray,
-    red_upper: np.ndarray,
+    blue_range: RangeDetector,
+    red_range: RangeDetector,
     min_zone_area: int,
+    hsv: Optional[np.ndarray] = None,
+    use_numba: bool = False,
+    scratch: Optional[VisionScratch] = None,
+    last_zones: Tuple[Optional[Box], Optional[Box]] = (None, None),
+    zone_margin: int = 32,
 ) -> Tuple[Optional[Box], Optional[Box]]:
     """
     Returns (origin_box, target_box) detected from frame, or (None, None)
-    if no suitable contours are found.
+    if no suitable contours are found. blue_range/red_range are the zone
+    colours, built once with specialize.make_range_detector().
+
+    Pass hsv (the frame already converted with COLOR_BGR2HSV) to skip the
+    internal conversion when the caller shares it across detectors.
+
+    With use_numba (and Numba installed), both masks come from one fused
+    BGR->HSV->threshold pass over frame_bgr instead (hsv is not needed).
+    scratch supplies preallocated buffers for the HSV image and both masks.
+    The two zones are thresholded/labelled concurrently.
+
+    last_zones holds the previous (origin_box, target_box). On the OpenCV
+    path each zone is then searched only within zone_margin pixels of its
+    last box, falling back to the full frame if it isn't cleanly found there.
     """
-    hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    if scratch is None:
+        scratch = VisionScratch.for_frame(frame_bgr)
 
-    blue_mask = cv2.inRange(hsv, blue_lower, blue_upper)
-    red_mask = cv2.inRange(hsv, red_lower, red_upper)
+    if use_numba and NUMBA_AVAILABLE:
+        from . import _hsv_kernels  # deferred: importing the kernels pulls in numba
 
-    origin_box = _largest_contour_box(blue_mask, min_zone_area)
-    target_box = _largest_contour_box(red_mask, min_zone_area)
+        blue_mask, red_mask = scratch.blue_mask, scratch.red_mask
+        _hsv_kernels.bgr_to_two_masks(
+            frame_bgr, blue_range.lower, blue_range.upper, red_range.lower, red_range.upper, blue_mask, red_mask
+        )
+        origin_future = _POOL.submit(_largest_blob_box, blue_mask, min_zone_area, scratch.zone_labels)
+        target_box = _largest_blob_box(red_mask, min_zone_area, scratch.labels)
+    else:
+        if hsv is None:
+            hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV, dst=scratch.hsv)
+        last_origin, last_target = last_zones
+        origin_future = _POOL.submit(
+            _zone_from_hsv, hsv, blue_range, scratch.blue_mask, min_zone_area,
+            last_origin, zone_margin, scratch.zone_labels,
+        )
+        target_box = _zone_from_hsv(
+            hsv, red_range, scratch.red_mask, min_zone_area, last_target, zone_margin, scratch.labels
+        )
 
-    return origin_box, target_box
+    return origin_future.result(), target_box
 
 
 def draw_box(frame: np.ndarray, box: Box, color: Tuple[int, int, int], label: str):
-    cv2.rectangle(frame, (box.x, box.y), (box.x + box.w, box.y + box.h), color, 2)
+    x, y, w, h = box
+    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
     cx, cy = box.center
     cv2.circle(frame, (cx, cy), 4, color, -1)
     cv2.putText(
         frame,
         label,
-        (box.x, box.y - 5),
+        (x, y - 5),
         cv2.FONT_HERSHEY_SIMPLEX,
         0.6,
         color,
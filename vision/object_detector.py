@@ -2,16 +2,38 @@ import cv2
 import numpy as np
 from typing import Optional, Tuple
 
-from .grid_detector import Box
+from ._numba import NUMBA_AVAILABLE
+from .grid_detector import Box, largest_component
+from .scratch import VisionScratch
+from .specialize import RangeDetector, make_range_detector
+
+# 3x3 structuring element for the open/close noise cleanup, built once
+_MORPH_K = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+
+
+def object_color_range(
+    object_min_saturation: int = 60,
+    object_min_value: int = 60,
+    object_max_value: int = 220,
+) -> RangeDetector:
+    """Colorful enough AND neither too dark nor too bright, any hue."""
+    return make_range_detector(
+        [0, object_min_saturation, object_min_value],
+        [255, 255, object_max_value],
+    )
+
+
+_DEFAULT_OBJECT_RANGE = object_color_range()
 
 
 def detect_object_in_origin(
     frame_bgr: np.ndarray,
     origin_box: Box,
     min_object_area: int,
-    object_min_saturation: int = 60,
-    object_min_value: int = 60,
-    object_max_value: int = 220,
+    object_range: Optional[RangeDetector] = None,
+    hsv: Optional[np.ndarray] = None,
+    scratch: Optional[VisionScratch] = None,
+    use_numba: bool = False,
 ) -> Optional[Tuple[int, int]]:
     """
     Detect a 'real' object inside the origin zone.
@@ -19,11 +41,20 @@ def detect_object_in_origin(
     We assume:
       - Background is white-ish (low saturation, high value)
       - Robot arm is black-ish (low value)
-      - Object is reasonably colorful and mid-bright
+      - Object is reasonably colorful and mid-bright (object_range, built
+        once with object_color_range(); defaults to its default thresholds)
+
+    If hsv (the full frame already converted to HSV) is given, the ROI is
+    cropped from it instead of converting the BGR crop again. scratch
+    supplies preallocated buffers; the ROI works in views of them.
+
+    With use_numba (and Numba installed) the BGR crop goes through one fused
+    convert+threshold+centroid kernel instead; hsv/scratch are not used and
+    all matching pixels count as one blob (no morphology).
 
     Returns (cx, cy) in full-frame coordinates, or None if nothing found.
     """
-    x, y, w, h = origin_box.x, origin_box.y, origin_box.w, origin_box.h
+    x, y, w, h = origin_box
 
     # Optionally crop a bit inside the box to avoid tape edges
     margin = int(min(w, h) * 0.10)
@@ -41,42 +72,45 @@ def detect_object_in_origin(
     if x1 <= x0 or y1 <= y0:
         return None
 
-    roi = frame_bgr[y0:y1, x0:x1]
-    if roi.size == 0:
-        return None
-
-    # Convert to HSV
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-    _, s_ch, v_ch = cv2.split(hsv)
+    if object_range is None:
+        object_range = _DEFAULT_OBJECT_RANGE
 
-    # Sufficiently colorful
-    sat_mask = cv2.inRange(s_ch, object_min_saturation, 255)
-    # Not too dark, not too bright
-    val_mask = cv2.inRange(v_ch, object_min_value, object_max_value)
+    if use_numba and NUMBA_AVAILABLE:
+        from . import _hsv_kernels  # deferred: importing the kernels pulls in numba
 
-    # Combined mask: colorful AND mid-bright
-    mask = cv2.bitwise_and(sat_mask, val_mask)
+        blob = _hsv_kernels.detect_blob(frame_bgr[y0:y1, x0:x1], object_range.lower, object_range.upper, min_object_area)
+        return None if blob is None else (x0 + blob[0], y0 + blob[1])
 
-    # Optional: clean up noise
-    kernel = np.ones((3, 3), np.uint8)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, iterations=1)
-    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel, iterations=1)
+    rh, rw = y1 - y0, x1 - x0
+    if scratch is None:
+        scratch = VisionScratch.for_shape(rh, rw)
 
-    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-    if not contours:
+    if hsv is not None:
+        hsv_roi = hsv[y0:y1, x0:x1]
+    else:
+        roi = frame_bgr[y0:y1, x0:x1]
+        if roi.size == 0:
+            return None
+        # Convert to HSV
+        hsv_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV, dst=scratch.hsv[:rh, :rw])
+    if hsv_roi.size == 0:
         return None
 
-    largest = max(contours, key=cv2.contourArea)
-    area = cv2.contourArea(largest)
-    if area < min_object_area:
-        return None
+    # ROI-sized views into the preallocated planes
+    mask = scratch.obj_mask[:rh, :rw]
+    morph = scratch.morph[:rh, :rw]
 
-    M = cv2.moments(largest)
-    if M["m00"] == 0:
-        return None
+    # One inRange pass over all three channels
+    object_range(hsv_roi, mask)
 
-    cx_local = int(M["m10"] / M["m00"])
-    cy_local = int(M["m01"] / M["m00"])
+    # Optional: clean up noise
+    cv2.morphologyEx(mask, cv2.MORPH_OPEN, _MORPH_K, dst=morph, iterations=1)
+    cv2.morphologyEx(morph, cv2.MORPH_CLOSE, _MORPH_K, dst=mask, iterations=1)
+
+    found = largest_component(mask, min_object_area, scratch.labels[:rh, :rw])
+    if found is None:
+        return None
+    cx_local, cy_local = found[1]
 
     # Map back into full-frame coords (remember we cropped with margin)
     cx = x0 + cx_local
@@ -0,0 +1,46 @@
+# vision/scratch.py
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class VisionScratch:
+    """
+    Preallocated per-frame working buffers for the detectors.
+
+    Detectors write into these via OpenCV's dst= arguments (using views for
+    ROIs), so the frame loop doesn't allocate fresh HSV/mask arrays every
+    iteration. Allocate once per frame size with for_frame().
+    """
+    hsv: np.ndarray         # H x W x 3, full-frame HSV
+    blue_mask: np.ndarray   # H x W, origin zone
+    red_mask: np.ndarray    # H x W, target zone
+    pink_mask: np.ndarray   # H x W, tip marker
+    obj_mask: np.ndarray    # H x W, object mask (ROI view)
+    morph: np.ndarray       # H x W, morphology intermediate
+    labels: np.ndarray      # H x W int32, connected-component labels
+    zone_labels: np.ndarray # H x W int32, labels for the zone worker thread
+
+    @classmethod
+    def for_shape(cls, height: int, width: int) -> "VisionScratch":
+        def plane():
+            return np.empty((height, width), np.uint8)
+
+        return cls(
+            hsv=np.empty((height, width, 3), np.uint8),
+            blue_mask=plane(),
+            red_mask=plane(),
+            pink_mask=plane(),
+            obj_mask=plane(),
+            morph=plane(),
+            labels=np.empty((height, width), np.int32),
+            zone_labels=np.empty((height, width), np.int32),
+        )
+
+    @classmethod
+    def for_frame(cls, frame: np.ndarray) -> "VisionScratch":
+        return cls.for_shape(frame.shape[0], frame.shape[1])
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return self.hsv.shape[:2] == frame.shape[:2]
@@ -0,0 +1,35 @@
+# vision/specialize.py
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RangeDetector:
+    """
+    An HSV colour range fixed at startup.
+
+    Calling it as detector(hsv, dst) runs cv2.inRange with its bounds.
+    lower/upper are read-only uint8 arrays, which the fused Numba kernels
+    take directly.
+    """
+    lower: np.ndarray
+    upper: np.ndarray
+
+    def __call__(self, src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+        return cv2.inRange(src, self.lower, self.upper, dst=dst)
+
+
+def make_range_detector(lower, upper) -> RangeDetector:
+    """
+    Build a RangeDetector from lower/upper (H, S, V).
+
+    The bounds are converted to uint8 arrays once and locked against
+    writes, so every caller shares the same values unchanged.
+    """
+    lo = np.array(lower, dtype=np.uint8)
+    hi = np.array(upper, dtype=np.uint8)
+    lo.setflags(write=False)
+    hi.setflags(write=False)
+    return RangeDetector(lo, hi)